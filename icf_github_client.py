@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""icf_github_client.py
+
+Leichtgewichtiger Client für die ICF-JSON-Daten im GitHub-Repository
+(raw.githubusercontent.com), passend zu den Endpunkten aus
+``functions/openai.actions.yaml``. Gedacht für lokale Skripte und
+Analysen, die den Export aus ``icf_to_json.py`` konsumieren.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from statistics import mean
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # orjson deserialisiert die rohen Response-Bytes deutlich schneller
+    # als resp.json()/stdlib-json.
+    import orjson
+except ImportError:
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+BASE_URL = "https://raw.githubusercontent.com/politpatrick/icf-api/main/icf_json"
+
+# Eine Session für alle Abrufe: hält TCP-/TLS-Verbindungen im Pool offen,
+# statt pro Request einen neuen Handshake zu bezahlen.
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    ),
+)
+
+# Persistenter Cache über Prozessgrenzen hinweg: pro URL werden ETag und
+# Body abgelegt; unveränderte Dateien beantwortet GitHub dann mit einem
+# körperlosen 304 statt einer vollen Übertragung.
+_CACHE_DIR = Path(os.environ.get("ICF_CACHE_DIR", Path.home() / ".cache" / "icf"))
+
+def _cache_paths(url: str) -> Tuple[Path, Path]:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+    return _CACHE_DIR / f"{digest}.etag", _CACHE_DIR / f"{digest}.body"
+
+def _get_cached(url: str, timeout: int) -> Tuple[int, bytes]:
+    """GET mit ETag-Revalidierung gegen den On-Disk-Cache.
+
+    Liefert ``(status, body)``; ein 304 wird transparent als 200 mit dem
+    gecachten Body beantwortet. Bei Netzwerkfehlern wird, falls vorhanden,
+    der letzte bekannte Stand ausgeliefert."""
+    etag_path, body_path = _cache_paths(url)
+    headers = {}
+    have_cache = etag_path.exists() and body_path.exists()
+    if have_cache:
+        headers["If-None-Match"] = etag_path.read_text(encoding="utf-8")
+    try:
+        resp = _session.get(url, timeout=timeout, headers=headers)
+    except requests.RequestException:
+        if have_cache:
+            return 200, body_path.read_bytes()
+        raise
+    if resp.status_code == 304 and have_cache:
+        return 200, body_path.read_bytes()
+    if resp.status_code == 200:
+        etag = resp.headers.get("ETag")
+        if etag:
+            _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(resp.content)
+            etag_path.write_text(etag, encoding="utf-8")
+    return resp.status_code, resp.content
+
+_dataset: Optional[Dict[str, Dict]] = None
+_dataset_blob_lower: Optional[bytes] = None
+_dataset_missing = False
+_search_index: Optional[Dict[str, List[str]]] = None
+_search_index_missing = False
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def fetch_search_index() -> Optional[Dict[str, List[str]]]:
+    """Lädt den invertierten Such-Index (Token → Codes) aus
+    ``search_index.json``; ``None``, wenn der Export ihn nicht mitliefert."""
+    global _search_index, _search_index_missing
+    if _search_index is None and not _search_index_missing:
+        status, body = _get_cached(f"{BASE_URL}/search_index.json", timeout=30)
+        if status == 200:
+            _search_index = _loads(body)
+        else:
+            _search_index_missing = True
+    return _search_index
+
+def fetch_dataset() -> Optional[Dict[str, Dict]]:
+    """Lädt ``icf_flat.json`` einmalig als In-Memory-Datensatz
+    (Code → vollständiges Klassen-Dict). Ein einziger Abruf ersetzt damit
+    die ~1500 Einzel-GETs beim Durchsuchen des Gesamtbestands. Liefert
+    ``None``, wenn das Bundle im Repository fehlt."""
+    global _dataset, _dataset_blob_lower, _dataset_missing
+    if _dataset is None and not _dataset_missing:
+        status, body = _get_cached(f"{BASE_URL}/icf_flat.json", timeout=30)
+        if status == 200:
+            _dataset = _loads(body)
+            # Kleingeschriebene Roh-Bytes als Vorfilter für search_text.
+            # Über den Umweg str.lower(), weil bytes.lower() nur ASCII
+            # kennt — die Daten stecken voller "Übelkeit" und "Ärger".
+            _dataset_blob_lower = body.decode("utf-8").lower().encode("utf-8")
+        else:
+            print(
+                f"Warnung: icf_flat.json nicht abrufbar (HTTP {status}), "
+                "falle auf Einzelabrufe zurück",
+                file=sys.stderr,
+            )
+            _dataset_missing = True
+    return _dataset
+
+class _FetchError(Exception):
+    """Abruf fehlgeschlagen (HTTP-Status im ersten Argument)."""
+
+@lru_cache(maxsize=1)
+def fetch_index() -> Dict[str, str]:
+    """Lädt ``index.json`` (Code → relativer Pfad) und cached das Ergebnis.
+
+    Fehlschläge lösen eine Exception aus und werden damit nicht gecached —
+    der nächste Aufruf versucht es erneut."""
+    status, body = _get_cached(f"{BASE_URL}/index.json", timeout=10)
+    if status != 200:
+        raise requests.HTTPError(f"index.json nicht abrufbar (HTTP {status})")
+    return _loads(body)
+
+@lru_cache(maxsize=4096)
+def _fetch_class_cached(rel_path: str) -> Dict:
+    status, body = _get_cached(f"{BASE_URL}/{rel_path}", timeout=10)
+    if status != 200:
+        raise _FetchError(status)
+    if rel_path.endswith(".gz"):
+        body = gzip.decompress(body)
+    return _loads(body)
+
+def fetch_class(rel_path: str) -> Optional[Dict]:
+    """Lädt die JSON-Datei einer Klasse über ihren relativen Pfad aus dem Index."""
+    try:
+        return _fetch_class_cached(rel_path)
+    except _FetchError as exc:
+        print(
+            f"Warnung: {rel_path} nicht abrufbar (HTTP {exc.args[0]})",
+            file=sys.stderr,
+        )
+        return None
+
+def get_class(code: str) -> Optional[Dict]:
+    """Bequemer Zugriff über den ICF-Code statt über den Pfad."""
+    if _dataset is not None:
+        return _dataset.get(code)
+    rel = fetch_index().get(code)
+    if rel is None:
+        return None
+    return fetch_class(rel)
+
+def list_children(code: str, recursive: bool = False) -> List[str]:
+    """Listet die Kind-Codes einer Klasse, optional über den ganzen Teilbaum."""
+    dataset = fetch_dataset()
+    known = dataset if dataset is not None else fetch_index()
+
+    def _collect(c: str, acc: List[str]) -> None:
+        data = get_class(c)
+        if data is None:
+            return
+        for child in data.get("children", []):
+            acc.append(child)
+            if recursive and child in known:
+                _collect(child, acc)
+
+    result: List[str] = []
+    _collect(code, result)
+    return result
+
+# Felder, die search_text pro Klasse durchsucht (vgl. class_to_dict).
+_SEARCH_FIELDS = (
+    "preferred",
+    "definitions",
+    "inclusions",
+    "exclusions",
+    "coding-hints",
+    "texts",
+)
+
+# Kleingeschriebene Suchfelder pro Code, einmal berechnet und über
+# Queries hinweg wiederverwendet.
+_lowercase_cache: Dict[str, Dict[str, object]] = {}
+
+def _lowered_fields(code: str, data: Dict) -> Dict[str, object]:
+    cached = _lowercase_cache.get(code)
+    if cached is None:
+        cached = {}
+        for field in _SEARCH_FIELDS:
+            value = data.get(field)
+            if value is None:
+                continue
+            if isinstance(value, str):
+                cached[field] = value.lower()
+            else:
+                cached[field] = [v.lower() for v in value]
+        _lowercase_cache[code] = cached
+    return cached
+
+def _match_fields(code: str, data: Dict, q: str) -> Optional[str]:
+    """Liefert das erste Feld, in dem der (kleingeschriebene) Begriff vorkommt."""
+    for field, value in _lowered_fields(code, data).items():
+        if isinstance(value, str):
+            if q in value:
+                return field
+        elif any(q in v for v in value):
+            return field
+    return None
+
+def _search_index_candidates(q: str) -> Optional[set]:
+    """Ermittelt Kandidaten-Codes über den invertierten Index.
+
+    Pro Query-Token werden die Postings aller Index-Tokens vereinigt, die
+    das Query-Token als Substring enthalten (erhält die bisherige
+    Substring-Semantik), anschließend über alle Query-Tokens geschnitten.
+    ``None`` heißt: Index nicht nutzbar, bitte auf den Scan zurückfallen."""
+    sidx = fetch_search_index()
+    if sidx is None:
+        return None
+    q_tokens = _TOKEN_RE.findall(q)
+    # Queries über Token-Grenzen hinweg (z. B. mit Leerzeichen/Bindestrich)
+    # kann der Token-Index nicht abbilden — voller Scan.
+    if len(q_tokens) != 1:
+        return None
+    q_token = q_tokens[0]
+    candidates: set = set()
+    for token, codes in sidx.items():
+        if q_token in token:
+            candidates.update(codes)
+    return candidates
+
+def _prefilter_safe(q: str) -> bool:
+    """Ob die Anfrage wörtlich im rohen JSON-Blob stehen kann. Anführungs-
+    zeichen, Backslashes und Steuerzeichen werden dort escaped gespeichert
+    (``"`` als ``\\"``) — für solche Anfragen würde der Containment-Test
+    fälschlich verneinen, also wird dann nicht vorgefiltert."""
+    return '"' not in q and "\\" not in q and not any(ord(c) < 0x20 for c in q)
+
+def search_text(query: str, limit: int = 20) -> List[Dict]:
+    """Substring-Suche (case-insensitiv) über Titel und Beschreibungstexte.
+
+    Die Klassen werden batchweise parallel geladen (I/O-bound, der GIL
+    wird während der Socket-Reads freigegeben); sobald ``limit`` Treffer
+    vorliegen, werden keine weiteren Batches mehr angefasst."""
+    q = query.lower()
+    results: List[Dict] = []
+    candidates = _search_index_candidates(q)
+    if candidates is not None:
+        for code in sorted(candidates):
+            data = get_class(code)
+            if data is None:
+                continue
+            field = _match_fields(code, data, q)
+            if field is not None:
+                results.append(
+                    {"code": code, "preferred": data.get("preferred"), "field": field}
+                )
+                if len(results) >= limit:
+                    break
+        return results
+    dataset = fetch_dataset()
+    if dataset is not None:
+        # Byte-Vorfilter: kommt der Begriff nirgends im rohen Bundle vor,
+        # lohnt der strukturierte Scan über ~1500 Dicts gar nicht erst.
+        # Nur für Anfragen ohne JSON-Escape-Zeichen aussagekräftig.
+        if (
+            _dataset_blob_lower is not None
+            and _prefilter_safe(q)
+            and q.encode("utf-8") not in _dataset_blob_lower
+        ):
+            return []
+        # Gesamtbestand liegt im Speicher: reiner Dict-Scan, kein HTTP.
+        for code, data in dataset.items():
+            field = _match_fields(code, data, q)
+            if field is not None:
+                results.append(
+                    {"code": code, "preferred": data.get("preferred"), "field": field}
+                )
+                if len(results) >= limit:
+                    break
+        return results
+    items = list(fetch_index().items())
+    batch_size = max(limit * 4, 32)
+    with ThreadPoolExecutor(max_workers=32) as ex:
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            datas = ex.map(fetch_class, (rel for _, rel in chunk))
+            for (code, _rel), data in zip(chunk, datas):
+                if data is None:
+                    continue
+                field = _match_fields(code, data, q)
+                if field is not None:
+                    results.append(
+                        {"code": code, "preferred": data.get("preferred"), "field": field}
+                    )
+                    if len(results) >= limit:
+                        return results
+    return results
+
+def stats() -> Dict[str, float]:
+    """Basis-Statistiken über alle Klassen (Anzahl, max. Tiefe, Ø Kinder).
+
+    Bevorzugt die beim Export vorberechnete ``stats_summary.json`` — ein
+    einziger Abruf statt eines Walks über alle Klassen-Dateien."""
+    status, body = _get_cached(f"{BASE_URL}/stats_summary.json", timeout=10)
+    if status == 200:
+        return _loads(body)
+    idx = fetch_index()
+    dataset = fetch_dataset()
+    if dataset is not None:
+        datas = [dataset.get(code) for code in idx]
+        rels = list(idx.values())
+    else:
+        rels = list(idx.values())
+        with ThreadPoolExecutor(max_workers=32) as ex:
+            datas = list(ex.map(fetch_class, rels))
+    depths: List[int] = []
+    child_counts: List[int] = []
+    for rel, data in zip(rels, datas):
+        if data is None:
+            continue
+        depths.append(rel.count("/"))
+        child_counts.append(len(data.get("children", [])))
+    return {
+        "total_classes": len(idx),
+        "max_depth": max(depths, default=0),
+        "avg_children": mean(child_counts) if child_counts else 0.0,
+    }
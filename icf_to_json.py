@@ -9,106 +9,418 @@ API- und Analyse-Zwecke.
 from __future__ import annotations
 
 import argparse
+import gzip
 import json
-import shutil
+import os
+import re
+import sqlite3
 import sys
 import textwrap
-import xml.etree.ElementTree as ET
+import zipfile
+
+try:
+    # lxml parst dank libxml2 deutlich schneller als das stdlib-ElementTree;
+    # die hier genutzte API (iterparse, findall, attrib, clear) ist identisch.
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from statistics import mean
 from typing import Dict, Iterable, List, Sequence
 
+try:
+    # orjson serialisiert um ein Vielfaches schneller und liefert direkt bytes.
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(data: object, pretty: bool = False) -> bytes:
+    """JSON-Serialisierung als UTF-8-Bytes; orjson wenn vorhanden, sonst stdlib.
+
+    Standard ist kompaktes JSON — die Dateien werden maschinell konsumiert,
+    Einrückung verdoppelt nur Dateigröße und Transfervolumen."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _loads(payload: bytes) -> object:
+    """JSON-Deserialisierung direkt aus Bytes; orjson wenn vorhanden."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 ########################
 # Grundlegende Parser  #
 ########################
 
-XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
-RUBRIC_KINDS = [
-    "preferred",
-    "definition",
-    "coding-hint",
-    "inclusion",
-    "exclusion",
-    "text",
-]
+# Interniert, damit der Attribut-Lookup pro Label über Pointer-Vergleich
+# statt Zeichenvergleich läuft.
+XML_LANG = sys.intern("{http://www.w3.org/XML/1998/namespace}lang")
+
+# (ClaML-kind, Ausgabeschlüssel im JSON); None markiert den Sonderfall
+# "preferred". Vorberechnet, damit class_to_dict nicht pro Klasse sechs
+# f-Strings bauen muss.
+RUBRIC_KIND_OUT = (
+    ("preferred", None),
+    ("definition", "definitions"),
+    ("coding-hint", "coding-hints"),
+    ("inclusion", "inclusions"),
+    ("exclusion", "exclusions"),
+    ("text", "texts"),
+)
+RUBRIC_KINDS = [kind for kind, _ in RUBRIC_KIND_OUT]
+# Für den Schnelltest im Rubrik-Sammler: unbekannte kinds sofort verwerfen,
+# statt ihre Label-Texte umsonst zu normalisieren.
+_RUBRIC_KINDS_SET = frozenset(RUBRIC_KINDS)
+
+# Top-Level-Elemente, die für den Export irrelevant sind und beim
+# Streaming-Parsen sofort wieder freigegeben werden können.
+_SKIP_TOP_LEVEL = {"Meta", "Identifier", "Title", "ClassKinds", "RubricKinds",
+                   "Modifier", "ModifierClass"}
+
+_WS = re.compile(r"\s+")
+
+def _normalize_ws(text: str) -> str:
+    """Kollabiert Whitespace-Läufe zu einzelnen Leerzeichen — ein
+    C-seitiger Regex-Durchlauf statt split/Listen-Allokation/join."""
+    return _WS.sub(" ", text.strip())
 
 def build_code_map(root: ET.Element) -> Dict[str, ET.Element]:
     return {cls.attrib["code"]: cls for cls in root.findall("Class")}
 
+def parse_code_map(xml_path: Path) -> Dict[str, ET.Element]:
+    """Streamt die ClaML-XML per ``iterparse`` und sammelt alle
+    ``<Class>``-Elemente in eine Code-Map, ohne den kompletten DOM
+    dauerhaft im Speicher zu halten. Nicht benötigte Top-Level-Elemente
+    (Meta, Modifier …) werden direkt nach dem Parsen geleert."""
+    code_map: Dict[str, ET.Element] = {}
+    context = ET.iterparse(str(xml_path), events=("start", "end"))
+    # Wurzel merken, damit die gesammelten Elemente nicht dem GC anheimfallen
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == "Class":
+            code_map[elem.attrib["code"]] = elem
+        elif elem.tag in _SKIP_TOP_LEVEL:
+            elem.clear()
+    return code_map
+
 def get_children_codes(cls_elem: ET.Element) -> List[str]:
-    return [sub.attrib["code"] for sub in cls_elem.findall("SubClass")]
+    # Direkte Kind-Iteration statt findall: erspart die ElementPath-Auswertung
+    return [sub.attrib["code"] for sub in cls_elem if sub.tag == "SubClass"]
 
 def extract_rubrics(cls_elem: ET.Element, kind: str, lang: str = "de") -> List[str]:
-    texts: List[str] = []
-    for rubric in cls_elem.findall("Rubric"):
-        if rubric.attrib.get("kind") != kind:
+    """Kompatibilitäts-Wrapper für den Einzel-kind-Zugriff; delegiert an den
+    Single-Pass-Sammler statt die Rubriken selbst erneut zu durchlaufen."""
+    return extract_all_rubrics(cls_elem, lang).get(kind, [])
+
+def extract_all_rubrics(cls_elem: ET.Element, lang: str = "de") -> Dict[str, List[str]]:
+    """Sammelt die Texte aller Rubriken eines Class-Elements in einem
+    einzigen Durchlauf, gruppiert nach ``kind``. Ersetzt den sechsfachen
+    Aufruf von :func:`extract_rubrics` pro Klasse."""
+    by_kind: Dict[str, List[str]] = {}
+    for rubric in cls_elem:
+        if rubric.tag == "Rubric":
+            _collect_rubric(rubric, by_kind, lang)
+    return by_kind
+
+def _collect_rubric(rubric: ET.Element, by_kind: Dict[str, List[str]], lang: str) -> None:
+    """Hängt die Label-Texte einer einzelnen Rubrik an die kind-Gruppe an."""
+    kind = rubric.attrib.get("kind")
+    if kind not in _RUBRIC_KINDS_SET:
+        return
+    texts = by_kind.setdefault(kind, [])
+    # Methoden-/Funktions-Lookups aus der Label-Schleife heben
+    texts_append = texts.append
+    normalize = _normalize_ws
+    xml_lang = XML_LANG
+    for label in rubric:
+        if label.tag != "Label":
             continue
-        for label in rubric.findall("Label"):
-            label_lang = label.attrib.get(XML_LANG, lang)
-            if label_lang == lang or XML_LANG not in label.attrib:
-                t = (label.text or "").strip()
+        label_lang = label.get(xml_lang)
+        if label_lang is None or label_lang == lang:
+            t = label.text
+            if t:
+                t = normalize(t)
                 if t:
-                    texts.append(" ".join(t.split()))
-    return texts
+                    texts_append(t)
 
 def class_to_dict(cls_elem: ET.Element, lang: str = "de") -> Dict:
+    # Ein einziger Durchlauf über die Kind-Elemente sammelt SubClass-Codes
+    # und Rubriken gemeinsam ein.
+    children: List[str] = []
+    by_kind: Dict[str, List[str]] = {}
+    children_append = children.append
+    collect_rubric = _collect_rubric
+    for child in cls_elem:
+        tag = child.tag
+        if tag == "SubClass":
+            children_append(child.attrib["code"])
+        elif tag == "Rubric":
+            collect_rubric(child, by_kind, lang)
     data: Dict[str, object] = {
         "code": cls_elem.attrib["code"],
         "kind": cls_elem.attrib.get("kind"),
-        "children": get_children_codes(cls_elem),
+        "children": children,
     }
-    for kind in RUBRIC_KINDS:
-        texts = extract_rubrics(cls_elem, kind, lang)
+    for kind, out_key in RUBRIC_KIND_OUT:
+        texts = by_kind.get(kind)
         if not texts:
             continue
-        if kind == "preferred":
+        if out_key is None:
             data["preferred"] = texts[0]
             if len(texts) > 1:
                 data["preferred_full"] = texts
         else:
-            data[f"{kind}s"] = texts
+            data[out_key] = texts
     return data
 
 ##########################################
 # Export-Logik (rekursiv + Index)        #
 ##########################################
 
-def _save_class_recursive(
-    cls_elem: ET.Element,
+_TOKEN_RE = re.compile(r"\w+")
+
+# Textfelder, die in den Such-Index einfließen (vgl. class_to_dict).
+_SEARCH_TEXT_KEYS = (
+    "preferred",
+    "definitions",
+    "inclusions",
+    "exclusions",
+    "coding-hints",
+    "texts",
+)
+
+def _index_class_tokens(data: Dict, search_index: Dict[str, set]) -> None:
+    """Zerlegt die Textfelder einer Klasse in Tokens und trägt den Code
+    in die invertierte Index-Struktur (Token → Codes) ein."""
+    code = data["code"]
+    for key in _SEARCH_TEXT_KEYS:
+        value = data.get(key)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = (value,)
+        for text in value:
+            for token in _TOKEN_RE.findall(text.lower()):
+                search_index.setdefault(token, set()).add(code)
+
+def _write_file(path: str, payload: bytes, dir_fd: "int | None" = None) -> None:
+    """Schreibt eine Datei in einem Schuss über einen rohen File-Deskriptor —
+    ohne die BufferedIO-/TextIOWrapper-Schichten, die Path.write_text bzw.
+    write_bytes pro Datei aufbauen. Mit ``dir_fd`` ist ``path`` relativ zum
+    bereits geöffneten Zielordner und der Kernel spart sich die
+    Pfadauflösung pro Datei."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+
+def _encode_and_write(path: str, data: Dict, pretty: bool, compress: bool,
+                      dir_fd: "int | None" = None) -> None:
+    """Worker-Aufgabe: serialisiert, komprimiert (optional) und schreibt eine
+    Klasse. Läuft komplett im Pool, damit der Traversierungs-Thread nur noch
+    die Dicts baut."""
+    payload = _dumps(data, pretty)
+    if compress:
+        payload = gzip.compress(payload, compresslevel=6)
+    _write_file(path, payload, dir_fd)
+
+def _save_classes(
+    tops: Sequence[ET.Element],
     code_map: Dict[str, ET.Element],
     target_dir: Path,
     lang: str,
-    index: Dict[str, str],
-) -> None:
-    cls_dir = target_dir / cls_elem.attrib["code"]
-    cls_dir.mkdir(parents=True, exist_ok=True)
-    data = class_to_dict(cls_elem, lang)
-    json_path = cls_dir / f"{data['code']}.json"
-    json_path.write_text(
-        json.dumps(data, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
-    index[data["code"]] = str(json_path.relative_to(target_dir))
-    for child_code in data["children"]:
-        child_elem = code_map.get(child_code)
-        if child_elem is None:
-            print(f"Warnung: Unterklasse {child_code} nicht gefunden", file=sys.stderr)
-            continue
-        _save_class_recursive(child_elem, code_map, cls_dir, lang, index)
+    search_index: Dict[str, set],
+    pool: ThreadPoolExecutor,
+    pretty: bool = False,
+    compress: bool = False,
+    dir_fd: "int | None" = None,
+    sqlite_rows: "List[tuple] | None" = None,
+) -> Dict[str, object]:
+    """Traversiert die Klassen-Hierarchie iterativ (expliziter Stack statt
+    Rekursion) und schreibt pro Klasse eine JSON-Datei (``.json.gz`` bei
+    aktivierter Kompression).
 
-def export_icf(xml_path: Path, target_dir: Path, lang: str = "de") -> Dict[str, str]:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    code_map = build_code_map(root)
-    tops = [c for c in code_map.values() if c.attrib.get("kind") == "component"]
+    Die Ablage ist flach: jede Klasse landet direkt als
+    ``target_dir/<code>.json`` — die Codes sind eindeutig, und ohne die
+    frühere Verzeichnis-pro-Klasse-Struktur entfallen ~1500 mkdir-Aufrufe
+    und Inodes. Die Hierarchie selbst steckt weiterhin in den
+    ``children``-Feldern und im Index.
+
+    Liefert eine Statistik-Zusammenfassung (Klassenzahl, maximale Tiefe,
+    durchschnittliche Kinderzahl), die nebenbei beim Traversieren anfällt
+    — Clients müssen dafür dann keine Einzeldateien mehr anfassen."""
+    root_dir = str(target_dir)
+    suffix = ".json.gz" if compress else ".json"
+    depths: List[int] = []
+    child_counts: List[int] = []
+    # Fehlende Unterklassen werden gesammelt und vom Aufrufer in einem
+    # Schwung gemeldet — ein stderr-Write statt einem pro Treffer.
+    missing: List[str] = []
+    futures: List = []
+    futures_append = futures.append
+    # Methoden-Lookups aus der Schleife heben
+    code_map_get = code_map.get
+    submit = pool.submit
+    stack = [(comp, 0, None) for comp in tops]
+    stack_append = stack.append
+    while stack:
+        cls_elem, depth, parent = stack.pop()
+        code = cls_elem.attrib["code"]
+        data = class_to_dict(cls_elem, lang)
+        name = code + suffix
+        if dir_fd is None:
+            name = os.path.join(root_dir, name)
+        futures_append(submit(_encode_and_write, name, data, pretty, compress, dir_fd))
+        _index_class_tokens(data, search_index)
+        if sqlite_rows is not None:
+            sqlite_rows.append((code, parent, depth, data))
+        depths.append(depth)
+        children = data["children"]
+        child_counts.append(len(children))
+        for child_code in children:
+            child_elem = code_map_get(child_code)
+            if child_elem is None:
+                missing.append(child_code)
+                continue
+            stack_append((child_elem, depth + 1, code))
+    # Worker-Fehler (z. B. volle Platte) nicht verschlucken: erst alle
+    # Schreib-Tasks abwarten, dann die erste Exception weiterreichen.
+    first_error: "BaseException | None" = None
+    for fut in futures:
+        exc = fut.exception()
+        if exc is not None and first_error is None:
+            first_error = exc
+    if first_error is not None:
+        raise first_error
+    return {
+        "total_classes": len(depths),
+        "max_depth": max(depths, default=0),
+        "avg_children": mean(child_counts) if child_counts else 0.0,
+        "missing_children": missing,
+    }
+
+# Meta-Dateien im Zielordner, die nicht zu einer einzelnen Klasse gehören
+_META_FILES = {"index.json", "search_index.json", "stats_summary.json", "icf_flat.json"}
+
+def _build_index(target_dir: Path) -> Dict[str, str]:
+    """Baut den Index (Code → Dateiname) in einem einzigen scandir-Lauf
+    über den flachen Zielordner, statt ihn als geteilten Zustand durch die
+    Traversierung zu fädeln. Bei Mischbeständen hilft ``--clean``."""
     index: Dict[str, str] = {}
-    for comp in tops:
-        _save_class_recursive(comp, code_map, target_dir, lang, index)
+    with os.scandir(target_dir) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name in _META_FILES:
+                continue
+            if entry.name.endswith(".json.gz"):
+                index[entry.name[:-8]] = entry.name
+            elif entry.name.endswith(".json"):
+                index[entry.name[:-5]] = entry.name
+    return index
+
+def _write_archive(target_dir: Path, index: Dict[str, str]) -> None:
+    """Bündelt alle Klassen-Dateien zusätzlich in ``icf.zip`` (unkomprimiert):
+    ein einziges Datei-Handle mit Central-Directory-Random-Access statt
+    tausender Einzeldateien — praktisch für rsync/Deploy und für Konsumenten,
+    die nur Lookup-by-Code brauchen."""
+    with zipfile.ZipFile(
+        target_dir / "icf.zip", "w", compression=zipfile.ZIP_STORED
+    ) as zf:
+        for name in index.values():
+            zf.writestr(name, (target_dir / name).read_bytes())
+
+def _write_sqlite(db_path: Path, rows: "List[tuple]") -> None:
+    """Schreibt zusätzlich ``icf.sqlite``: ein einziges Datei-Handle mit
+    O(log N)-Code-Lookup (``classes``) und FTS5-Volltextsuche
+    (``classes_fts``) — die API-seitigen Hot-Operationen müssen dann nicht
+    tausende Einzeldateien anfassen. Ergänzt den JSON-Export, ersetzt ihn
+    nicht."""
+    if db_path.exists():
+        db_path.unlink()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "CREATE TABLE classes (code TEXT PRIMARY KEY, parent TEXT, depth INTEGER, json BLOB)"
+        )
+        conn.execute("CREATE INDEX classes_parent ON classes(parent)")
+        conn.execute(
+            "CREATE VIRTUAL TABLE classes_fts USING fts5("
+            "code UNINDEXED, preferred, definitions, coding_hints, inclusions, exclusions)"
+        )
+        class_rows = []
+        fts_rows = []
+        for code, parent, depth, data in rows:
+            class_rows.append((code, parent, depth, _dumps(data)))
+            fts_rows.append((
+                code,
+                data.get("preferred") or "",
+                " ".join(data.get("definitions") or ()),
+                " ".join(data.get("coding-hints") or ()),
+                " ".join(data.get("inclusions") or ()),
+                " ".join(data.get("exclusions") or ()),
+            ))
+        # Alle Inserts in einer Transaktion — ein fsync statt einem pro Zeile
+        with conn:
+            conn.executemany("INSERT INTO classes VALUES (?,?,?,?)", class_rows)
+            conn.executemany("INSERT INTO classes_fts VALUES (?,?,?,?,?,?)", fts_rows)
+    finally:
+        conn.close()
+
+def export_icf(xml_path: Path, target_dir: Path, lang: str = "de", pretty: bool = False, compress: bool = False, archive: bool = False, database: bool = False) -> Dict[str, str]:
+    # Zielordner anlegen — nicht nur für die CLI, auch für Bibliotheks-
+    # Aufrufer; mit der flachen Ablage legt ihn sonst niemand mehr an.
+    target_dir.mkdir(parents=True, exist_ok=True)
+    code_map = parse_code_map(xml_path)
+    tops = [c for c in code_map.values() if c.attrib.get("kind") == "component"]
+    search_index: Dict[str, set] = {}
+    sqlite_rows: "List[tuple] | None" = [] if database else None
+    # Die eigentlichen Datei-Schreibvorgänge laufen in einem Thread-Pool,
+    # damit Platten-I/O das Traversieren/Serialisieren nicht blockiert.
+    pool = ThreadPoolExecutor(max_workers=8)
+    # Zielordner einmal öffnen und alle Klassen-Dateien relativ dazu
+    # schreiben — erspart dem Kernel die Pfadauflösung pro Datei.
+    dir_fd = os.open(str(target_dir), os.O_RDONLY) if os.open in os.supports_dir_fd else None
+    try:
+        stats_summary = _save_classes(
+            tops, code_map, target_dir, lang, search_index, pool, pretty, compress,
+            dir_fd, sqlite_rows
+        )
+    finally:
+        # Pool vor dem Schließen des dir_fd entleeren, damit kein Worker
+        # auf einem bereits geschlossenen Deskriptor schreibt.
+        pool.shutdown(wait=True)
+        if dir_fd is not None:
+            os.close(dir_fd)
+    missing = stats_summary.pop("missing_children")
+    if missing:
+        sys.stderr.write(
+            f"Warnung: {len(missing)} Unterklassen nicht gefunden: "
+            + ", ".join(missing) + "\n"
+        )
+    index = _build_index(target_dir)
+    # Die Meta-Dateien werden ausschließlich maschinell konsumiert und
+    # deshalb unabhängig von --pretty immer kompakt geschrieben.
+    # Vorberechnete Statistiken, damit stats()-Clients nicht alle
+    # Klassen-Dateien abrufen müssen
+    (target_dir / "stats_summary.json").write_bytes(_dumps(stats_summary))
     # Schreibe Datei, falls gewünscht
-    (target_dir / "index.json").write_text(
-        json.dumps(index, ensure_ascii=False, indent=2),
-        encoding="utf-8"
+    (target_dir / "index.json").write_bytes(_dumps(index))
+    # Invertierter Such-Index (Token → sortierte Code-Liste) für die Clients
+    (target_dir / "search_index.json").write_bytes(
+        _dumps({token: sorted(codes) for token, codes in sorted(search_index.items())})
     )
+    if archive:
+        _write_archive(target_dir, index)
+    if sqlite_rows is not None:
+        _write_sqlite(target_dir / "icf.sqlite", sqlite_rows)
     # Gib Index zurück
     return index
 
@@ -116,67 +428,88 @@ def export_icf(xml_path: Path, target_dir: Path, lang: str = "de") -> Dict[str,
 # Komfort-Funktionen für den API-Einsatz  #
 ##########################################
 
-def create_flat_json(target_dir: Path) -> None:
+@lru_cache(maxsize=8)
+def _get_index_cached(index_path: str, mtime_ns: int) -> Dict[str, str]:
+    return _loads(Path(index_path).read_bytes())
+
+def _get_index(target_dir: Path) -> "Dict[str, str] | None":
+    """Liest ``index.json`` mit einem mtime-sensitiven Cache: wiederholte
+    Aufrufe im selben Prozess parsen die Datei nur einmal, eine geänderte
+    Datei invalidiert den Eintrag automatisch. ``None``, wenn sie fehlt."""
+    index_path = target_dir / "index.json"
+    try:
+        st = index_path.stat()
+    except FileNotFoundError:
+        return None
+    return _get_index_cached(str(index_path.resolve()), st.st_mtime_ns)
+
+def create_flat_json(target_dir: Path, pretty: bool = False) -> None:
     """
     Erstellt eine flache JSON-Datei aus den hierarchischen JSON-Dateien.
     
     Args:
         target_dir: Verzeichnis, in dem die index.json und alle anderen JSON-Dateien liegen
     """
-    # Index-Datei lesen
-    index_path = target_dir / "index.json"
-    if not index_path.exists():
-        print(f"Fehler: Index-Datei {index_path} nicht gefunden", file=sys.stderr)
+    # Index-Datei lesen (prozessweit gecached)
+    index = _get_index(target_dir)
+    if index is None:
+        print(f"Fehler: Index-Datei {target_dir / 'index.json'} nicht gefunden", file=sys.stderr)
         return
-
-    with open(index_path, "r", encoding="utf-8") as f:
-        index = json.load(f)
     
-    # Flat-Dictionary erstellen
-    flat_dict: Dict[str, Dict] = {}
+    # Roh-Bytes pro Code sammeln — die Dateien sind bereits valides JSON
+    # und werden unten verbatim zusammengesetzt
+    raw_parts: Dict[str, bytes] = {}
     missing_files = []
     
-    # Hilfsfunktion zum Finden von Dateien mit dem gleichen Basisnamen in einer verschachtelten Struktur
-    def find_file_by_code(base_dir: Path, code: str) -> Path:
-        # Versuche, die Datei durch rekursive Suche zu finden
-        for json_file in base_dir.glob(f"**/{code}.json"):
-            return json_file
-        # Wenn nicht gefunden, versuche alternativ, in dem angegebenen Verzeichnis zu suchen
-        possible_dir = base_dir / code
-        if possible_dir.exists() and possible_dir.is_dir():
-            possible_file = possible_dir / f"{code}.json"
-            if possible_file.exists():
-                return possible_file
-        # Nichts gefunden
-        return None
-    
+    # Fallback-Karte (Code → Pfad) für Dateien, die nicht am Index-Pfad
+    # liegen; wird höchstens einmal per scandir-Walk gebaut, statt pro
+    # fehlendem Code den ganzen Baum zu durchsuchen (vorher O(N²))
+    fallback_map: "Dict[str, Path] | None" = None
+
+    def build_fallback_map() -> Dict[str, Path]:
+        mapping: Dict[str, Path] = {}
+        stack = [target_dir]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        stack.append(Path(entry.path))
+                    elif entry.name in _META_FILES:
+                        continue
+                    elif entry.name.endswith(".json.gz"):
+                        mapping.setdefault(entry.name[:-8], Path(entry.path))
+                    elif entry.name.endswith(".json"):
+                        mapping.setdefault(entry.name[:-5], Path(entry.path))
+        return mapping
+
     # Alle JSON-Dateien aus dem Index laden
     for code, rel_path in index.items():
         # Versuche zuerst den direkten Pfad
         json_path = target_dir / rel_path
         found = False
-        
+
         if json_path.exists():
             # Direkte Pfadauflösung erfolgreich
             found = True
         else:
-            # Versuche, die Datei durch den Code zu finden
-            alternative_path = find_file_by_code(target_dir, code)
+            # Versuche, die Datei über die einmalig gebaute Karte zu finden
+            if fallback_map is None:
+                fallback_map = build_fallback_map()
+            alternative_path = fallback_map.get(code)
             if alternative_path:
                 json_path = alternative_path
                 print(f"Info: JSON-Datei für Code {code} gefunden unter {json_path}", file=sys.stderr)
                 found = True
-        
+
         if not found:
             missing_files.append((code, str(json_path)))
             continue
             
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-            # Code in das flache Dictionary einfügen
-            flat_dict[code] = data
+            raw = json_path.read_bytes()
+            if json_path.suffix == ".gz":
+                raw = gzip.decompress(raw)
+            raw_parts[code] = raw
         except Exception as e:
             print(f"Fehler beim Lesen von {json_path}: {e}", file=sys.stderr)
     
@@ -190,11 +523,55 @@ def create_flat_json(target_dir: Path) -> None:
     
     # Flache JSON-Datei schreiben
     flat_json_path = target_dir / "icf_flat.json"
-    flat_json_path.write_text(
-        json.dumps(flat_dict, ensure_ascii=False, indent=2),
-        encoding="utf-8"
+    if pretty:
+        # Lesbare Ausgabe braucht den Umweg über Parse + Re-Encode
+        flat_dict = {code: _loads(raw) for code, raw in raw_parts.items()}
+        flat_json_path.write_bytes(_dumps(flat_dict, pretty))
+    else:
+        # Verbatim-Splicing: die Datei-Bytes wandern unverändert in das
+        # Gesamtobjekt — kein JSON-Parse und kein Re-Encode auf dem Weg
+        parts = [_dumps(code) + b":" + raw.strip() for code, raw in raw_parts.items()]
+        flat_json_path.write_bytes(b"{" + b",".join(parts) + b"}")
+    print(f"Flache JSON-Datei erstellt: {flat_json_path} mit {len(raw_parts)} ICF-Codes")
+
+@lru_cache(maxsize=4)
+def _sqlite_conn(db_path: str) -> sqlite3.Connection:
+    """Ein offenes Handle pro Datenbank-Datei statt connect() pro Aufruf."""
+    return sqlite3.connect(db_path)
+
+def load_class_sqlite(db_path: Path, code: str) -> "Dict | None":
+    """Lädt eine Klasse per Primärschlüssel-Lookup aus ``icf.sqlite``."""
+    row = _sqlite_conn(str(db_path)).execute(
+        "SELECT json FROM classes WHERE code = ?", (code,)
+    ).fetchone()
+    return None if row is None else _loads(row[0])
+
+def list_children_sqlite(db_path: Path, code: str, recursive: bool = False) -> List[str]:
+    """Listet die Kind-Codes einer Klasse; mit ``recursive`` den ganzen
+    Teilbaum über eine rekursive CTE statt N Einzel-Lookups."""
+    conn = _sqlite_conn(str(db_path))
+    if recursive:
+        cur = conn.execute(
+            "WITH RECURSIVE sub(code) AS ("
+            " SELECT code FROM classes WHERE parent = ?"
+            " UNION ALL"
+            " SELECT c.code FROM classes c JOIN sub s ON c.parent = s.code)"
+            " SELECT code FROM sub",
+            (code,),
+        )
+    else:
+        cur = conn.execute("SELECT code FROM classes WHERE parent = ?", (code,))
+    return [row[0] for row in cur]
+
+def search_text_sqlite(db_path: Path, query: str, limit: int = 20) -> List[str]:
+    """Volltextsuche über die FTS5-Tabelle; die Anfrage wird als Phrase
+    zitiert, damit FTS-Sonderzeichen nicht als Operatoren wirken."""
+    match = '"' + query.replace('"', '""') + '"'
+    cur = _sqlite_conn(str(db_path)).execute(
+        "SELECT code FROM classes_fts WHERE classes_fts MATCH ? LIMIT ?",
+        (match, limit),
     )
-    print(f"Flache JSON-Datei erstellt: {flat_json_path} mit {len(flat_dict)} ICF-Codes")
+    return [row[0] for row in cur]
 
 def _cli_stats(target_dir: Path) -> None:
     """
@@ -203,13 +580,52 @@ def _cli_stats(target_dir: Path) -> None:
     Args:
         target_dir: Verzeichnis, in dem die index.json liegt
     """
-    # Diese Funktion sollte später implementiert werden
-    print("Statistiken werden noch nicht unterstützt.")
+    # Die Kennzahlen liegen seit dem Export vorberechnet in
+    # stats_summary.json — keine einzige Klassen-Datei wird geöffnet.
+    summary_path = target_dir / "stats_summary.json"
+    try:
+        summary = _loads(summary_path.read_bytes())
+    except FileNotFoundError:
+        # Älterer Bestand ohne Summary: wenigstens die Klassenzahl lässt
+        # sich aus dem (gecachten) Index ablesen.
+        index = _get_index(target_dir)
+        if index is None:
+            print(f"Fehler: {summary_path} nicht gefunden", file=sys.stderr)
+            return
+        summary = {"total_classes": len(index)}
+    print("ICF-Statistiken:")
+    print(f"  Klassen gesamt:       {summary.get('total_classes', '?')}")
+    print(f"  Maximale Tiefe:       {summary.get('max_depth', '?')}")
+    avg = summary.get("avg_children")
+    if isinstance(avg, (int, float)):
+        print(f"  Kinder im Schnitt:    {avg:.2f}")
+    else:
+        print("  Kinder im Schnitt:    ?")
 
 ##########################################
 # Kommandozeilen-Interface               #
 ##########################################
 
+def _clean_tree(target_dir: Path) -> None:
+    """Räumt den Zielordner für ``--clean`` ab. Die unlink-Aufrufe laufen
+    parallel im Thread-Pool — bei ~1500 Klassen-Dateien deutlich schneller
+    als das serielle shutil.rmtree."""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        join = os.path.join
+        for dirpath, dirnames, filenames in os.walk(target_dir, topdown=False):
+            # Symlinks auf Ordner landen in dirnames, werden aber nie als
+            # dirpath besucht — sie müssen als Link entfernt werden, sonst
+            # bleibt der Elternordner für rmdir nicht leer.
+            for name in dirnames:
+                link = join(dirpath, name)
+                if os.path.islink(link):
+                    os.unlink(link)
+            # Erst wenn alle unlinks dieses Ordners durch sind, darf der
+            # Ordner selbst weg.
+            for _ in pool.map(os.unlink, [join(dirpath, name) for name in filenames]):
+                pass
+            os.rmdir(dirpath)
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="ICF ClaML → hierarchische JSON-Export-Routine mit Zusatz-APIs",
@@ -227,18 +643,22 @@ Beispiel:
     parser.add_argument("--flatten",  action="store_true", help="Erzeuge icf_flat.json")
     parser.add_argument("--stats",    action="store_true", help="Gib Basis-Statistiken aus")
     parser.add_argument("--clean",    action="store_true", help="Vorher Zielordner löschen")
+    parser.add_argument("--pretty",   action="store_true", help="JSON eingerückt statt kompakt schreiben")
+    parser.add_argument("--gzip",     action="store_true", help="Klassen-Dateien gzip-komprimiert (.json.gz) schreiben")
+    parser.add_argument("--zip",      action="store_true", help="Zusätzlich alle Klassen-Dateien in icf.zip bündeln")
+    parser.add_argument("--sqlite",   action="store_true", help="Zusätzlich icf.sqlite mit FTS5-Suchtabelle schreiben")
     args = parser.parse_args()
 
     if args.clean and args.target_dir.exists():
-        shutil.rmtree(args.target_dir)
+        _clean_tree(args.target_dir)
     args.target_dir.mkdir(parents=True, exist_ok=True)
 
     # Exportiere und erhalte Index
-    index = export_icf(args.xml_path, args.target_dir, args.lang)
+    index = export_icf(args.xml_path, args.target_dir, args.lang, pretty=args.pretty, compress=args.gzip, archive=args.zip, database=args.sqlite)
 
     # Optional: Flatten und Stats
     if args.flatten:
-        create_flat_json(args.target_dir)
+        create_flat_json(args.target_dir, pretty=args.pretty)
     if args.stats:
         _cli_stats(args.target_dir)
 